@@ -2,23 +2,68 @@
 
 __all__ = ["Backend"]
 
-import copy
-import itertools
+import bisect
+import functools
 import logging
+import marshal
+import mmap
 import os
-import pickle
 import re
 import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
 import click
-import markdown
-import markdown.extensions.codehilite
-import markdown.extensions.fenced_code
 
 logger = logging.getLogger(__name__)
 
+# Compiled once; the negated character class can't backtrack, unlike `.+?`.
+WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Writes `data` via a temp file and os.replace.
+
+    Readers never observe partial contents and a crash mid-write can't
+    truncate the target. Writing bytes in one call also skips the
+    TextIOWrapper encoding layer.
+    """
+    tmp = tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+@functools.lru_cache(maxsize=4096)
+def default_title(fname: str) -> str:
+    return fname.replace("-", " ").replace("_", "_").capitalize()
+
+
+def iter_wikilinks(data: bytes):
+    """Yields the raw names inside `[[...]]` spans.
+
+    For this trivial delimiter pair a bytes.find loop (memchr under the
+    hood) beats the regex engine's per-match overhead, which matters for
+    the indexer that scans every note.
+    """
+    pos = 0
+    while True:
+        start = data.find(b"[[", pos)
+        if start < 0:
+            return
+        end = data.find(b"]]", start + 2)
+        if end < 0:
+            return
+        yield data[start + 2:end]
+        pos = end + 2
+
 
 def reset_logger() -> None:
     root = logging.getLogger()
@@ -32,75 +77,168 @@ def reset_logger() -> None:
     root.addHandler(handler)
 
 
+def walk_notes(root: Path) -> List[Tuple[Path, float]]:
+    """Recursively lists `(path, mtime)` for markdown files under `root`.
+
+    `os.scandir` entries carry the stat result from the directory read,
+    which avoids a second stat() syscall per file for the mtime.
+    """
+    entries = []
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md"):
+                    entries.append((Path(entry.path), entry.stat().st_mtime))
+    return entries
+
+
 class Backlinks:
     """Utility class for efficiently managing backlinks."""
 
     def __init__(
         self,
         cache_dir: Optional[Path],
-        fpaths: List[Path],
+        entries: List[Tuple[Path, float]],
     ) -> None:
         if cache_dir is None:
             self.cache_path = None
             self.ignore_cached = True
         else:
-            self.cache_path = cache_dir / "backlinks.pkl"
+            self.cache_path = cache_dir / "backlinks.marshal"
             self.ignore_cached = False
-        self.fpaths = fpaths
-        self.stem_map = {fpath.stem: fpath for fpath in self.fpaths}
-        self.titles = {
-            fpath.stem: self.read_title(fpath)
-            for fpath in self.fpaths
-        }
+        # One canonical path index; fpaths is just a view over it.
+        self.stem_map = {fpath.stem: fpath for fpath, _ in entries}
+        self.scan_mtimes = {fpath.stem: mtime for fpath, mtime in entries}
+        # Populated lazily by get_title; reading every first line up front
+        # costs one open() per note at boot.
+        self.titles = {}
         self.backlinks = {}
+        self.out_links = {}
         self.mtimes = {}
+        self._sorted_cache = {}
+        self._dirty = False
         self.load()
 
+    @property
+    def fpaths(self) -> List[Path]:
+        # Returned sorted so CLI consumers don't each re-sort it.
+        return sorted(self.stem_map.values())
+
     def read_title(self, fpath: Path) -> str:
-        with open(fpath, "r") as f:
-            title = f.readline()
+        # Titles live on the first line, so a small fixed read via raw os
+        # calls skips the BufferedReader/TextIOWrapper setup that open()
+        # pays per file.
+        fd = os.open(fpath, os.O_RDONLY)
+        try:
+            buf = os.read(fd, 512)
+        finally:
+            os.close(fd)
+        title = buf.split(b"\n", 1)[0].decode("utf-8", errors="replace")
         if not title:
-            return self.default_title(fpath.stem)
+            return default_title(fpath.stem)
         return title[2:].strip()
 
-    def add_backlinks(self, fpath: Path) -> None:
-        with open(fpath, "r") as f:
-            for match in re.finditer(r"\[\[(.+?)\]\]", f.read()):
-                link_to = match.group(1)
+    def get_title(self, stem: str) -> Optional[str]:
+        title = self.titles.get(stem)
+        if title is None:
+            fpath = self.stem_map.get(stem)
+            if fpath is None:
+                return None
+            title = self.read_title(fpath)
+            self.titles[stem] = title
+        return title
+
+    def scan_links(self, fpath: Path) -> Set[str]:
+        # Memory-map the file and scan the raw bytes in place: the kernel
+        # pages in only what the scan touches, nothing is copied into a
+        # Python buffer, and only the short link names get decoded.
+        links = set()
+        fd = os.open(fpath, os.O_RDONLY)
+        try:
+            try:
+                mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return links  # Empty file; nothing to scan.
+        finally:
+            os.close(fd)
+        with mm:
+            for raw in iter_wikilinks(mm):
+                link_to = raw.decode("utf-8")
                 if fpath.stem == link_to:
                     raise ValueError(f"Self-referential backlink: {link_to}")
-                if link_to not in self.backlinks:
-                    self.backlinks[link_to] = {fpath.stem}
-                else:
-                    self.backlinks[link_to].add(fpath.stem)
+                links.add(link_to)
+        return links
+
+    def apply_links(self, stem: str, new_out: Set[str]) -> None:
+        """Diffs a file's outgoing links against the reverse index.
+
+        Only the links that actually changed are touched, so re-scanning
+        an edited note is O(links changed) and stale backlinks from
+        deleted references get cleaned up.
+        """
+        old_out = self.out_links.get(stem, set())
+        if old_out != new_out:
+            self._dirty = True
+        for link_to in old_out - new_out:
+            self.backlinks.get(link_to, set()).discard(stem)
+            self._sorted_cache.pop(link_to, None)
+        for link_to in new_out - old_out:
+            if link_to not in self.backlinks:
+                self.backlinks[link_to] = {stem}
+            else:
+                self.backlinks[link_to].add(stem)
+            self._sorted_cache.pop(link_to, None)
+        self.out_links[stem] = new_out
+
+    def add_backlinks(self, fpath: Path) -> None:
+        self.apply_links(fpath.stem, self.scan_links(fpath))
 
     def remove(self, stem: str) -> None:
+        self._dirty = True
+        self._sorted_cache.clear()
         fpath = self.stem_map[stem]
+        title = self.get_title(stem)
         fpath.unlink()
         self.stem_map.pop(stem)
+        self.titles.pop(stem, None)
         logger.info("Removed %s", fpath)
-        title = self.titles.pop(stem)
 
         if stem in self.backlinks:
+            # One combined pattern, compiled once per removal: the optional
+            # group matches the reference definition at the bottom (dropped
+            # entirely), while a bare link is flattened to its title.
+            esc = re.escape(stem)
+            pat = re.compile(rf"\[\[{esc}\]\](: {esc}.+\n)?")
+
+            def _strip(match: re.Match) -> str:
+                return "" if match.group(1) else title
+
+            needle = f"[[{stem}]]".encode("utf-8")
             for backlink in self.backlinks[stem]:
-                with open(self.stem_map[backlink], "r") as f:
-                    contents = f.read()
-                # Removes the link reference at the bottom.
-                contents = re.sub(
-                    rf"\[\[{stem}\]\]: {stem}.+\n", "", contents)
-                # Removes references to the link.
-                contents = re.sub(rf"\[\[{stem}\]\]", title, contents)
-                with open(self.stem_map[backlink], "w") as f:
-                    f.write(contents)
+                # Cheap bytes-level check before decoding and rewriting.
+                raw = self.stem_map[backlink].read_bytes()
+                if needle not in raw:
+                    continue
+                contents = pat.sub(_strip, raw.decode("utf-8"))
+                atomic_write_bytes(
+                    self.stem_map[backlink], contents.encode("utf-8"))
                 logger.info("Updated backlinks in %s", backlink)
 
-        for stem, backlinks in self.backlinks.items():
-            if stem in backlinks:
-                backlinks.remove(stem)
+        # The outgoing-link index tells us exactly which entries mention
+        # the removed note, so no scan over every stem is needed.
+        for target in self.out_links.pop(stem, set()):
+            self.backlinks.get(target, set()).discard(stem)
+        for backlink in self.backlinks.pop(stem, set()):
+            self.out_links.get(backlink, set()).discard(stem)
 
         self.save()
 
     def rename(self, old_stem: str, new_stem: str) -> None:
+        self._dirty = True
+        self._sorted_cache.clear()
         old_fpath = self.stem_map[old_stem]
         new_fpath = old_fpath.parent / f"{new_stem}.md"
         if old_fpath.parent != new_fpath.parent:
@@ -109,52 +247,97 @@ class Backlinks:
         old_fpath.rename(new_fpath)
         self.stem_map.pop(old_stem)
         self.stem_map[new_stem] = new_fpath
-        self.titles[new_stem] = self.titles.pop(old_stem)
+        title = self.titles.pop(old_stem, None)
+        if title is not None:
+            self.titles[new_stem] = title
         logger.info("Renamed %s to %s", old_fpath, new_fpath)
 
         if old_stem in self.backlinks:
+            # Only rewrite actual [[links]] (and their reference definitions)
+            # so renaming "note" can't clobber words like "notebook".
+            esc = re.escape(old_stem)
+            pat_refdef = re.compile(rf"\[\[{esc}\]\]: {esc}")
+            pat_link = re.compile(rf"\[\[{esc}\]\]")
+            needle = f"[[{old_stem}]]".encode("utf-8")
             for backlink in self.backlinks[old_stem]:
-                with open(self.stem_map[backlink], "r") as f:
-                    contents = f.read()
-                new_contents = contents.replace(old_stem, new_stem)
-                with open(self.stem_map[backlink], "w") as f:
-                    f.write(new_contents)
+                # Cheap bytes-level check before decoding and rewriting.
+                raw = self.stem_map[backlink].read_bytes()
+                if needle not in raw:
+                    continue
+                new_contents = pat_refdef.sub(
+                    f"[[{new_stem}]]: {new_stem}", raw.decode("utf-8"))
+                new_contents = pat_link.sub(f"[[{new_stem}]]", new_contents)
+                atomic_write_bytes(
+                    self.stem_map[backlink], new_contents.encode("utf-8"))
                 logger.info("Updated backlinks in %s", backlink)
 
             self.backlinks[new_stem] = self.backlinks[old_stem]
             self.backlinks.pop(old_stem)
 
-        for stem, backlinks in self.backlinks.items():
-            if old_stem in backlinks:
-                backlinks.add(new_stem)
-                backlinks.remove(old_stem)
+        # Retarget only the entries the outgoing-link index points at,
+        # instead of scanning every stem's backlink set.
+        for target in self.out_links.get(old_stem, set()):
+            links = self.backlinks.get(target)
+            if links is not None:
+                links.discard(old_stem)
+                links.add(new_stem)
+        if old_stem in self.out_links:
+            self.out_links[new_stem] = self.out_links.pop(old_stem)
+        for backlink in self.backlinks.get(new_stem, set()):
+            out = self.out_links.get(backlink)
+            if out is not None and old_stem in out:
+                out.discard(old_stem)
+                out.add(new_stem)
 
         self.save()
 
     def load(self) -> None:
         if not self.ignore_cached and self.cache_path.exists():
             with open(self.cache_path, "rb") as f:
-                pkl_data = pickle.load(f)
-                self.backlinks = pkl_data["backlinks"]
-                self.mtimes = pkl_data["mtimes"]
+                try:
+                    cached = marshal.load(f)
+                except (EOFError, ValueError, TypeError):
+                    cached = None  # Corrupt cache; fall back to a rescan.
+            if cached is not None:
+                # Marshal can't serialize sets, so they round-trip as lists.
+                self.backlinks = {
+                    k: set(v) for k, v in cached["backlinks"].items()
+                }
+                self.out_links = {
+                    k: set(v) for k, v in cached.get("out_links", {}).items()
+                }
+                self.mtimes = cached["mtimes"]
 
         # Updates backlinks cache with new mod times.
+        stale = []
         for fpath in self.fpaths:
             k = fpath.stem
-            if self.ignore_cached or fpath.stat().st_mtime > self.mtimes.get(k, 0):
-                self.mtimes[k] = fpath.stat().st_mtime
-                self.add_backlinks(fpath)
+            mtime = self.scan_mtimes[k]
+            if self.ignore_cached or mtime > self.mtimes.get(k, 0):
+                self.mtimes[k] = mtime
+                self._dirty = True
+                stale.append(fpath)
+
+        # The scan is I/O-bound, so fan it out across threads and merge
+        # the per-file link sets back on this thread.
+        if stale:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for fpath, links in zip(stale, executor.map(self.scan_links, stale)):
+                    self.apply_links(fpath.stem, links)
 
         self.save()
 
     def save(self) -> None:
-        if not self.ignore_cached:
-            with open(self.cache_path, "wb") as f:
-                pkl_data = {
-                    "backlinks": self.backlinks,
-                    "mtimes": self.mtimes,
-                }
-                pickle.dump(pkl_data, f)
+        if self.ignore_cached or not self._dirty:
+            return
+        data = {
+            "backlinks": {k: list(v) for k, v in self.backlinks.items()},
+            "out_links": {k: list(v) for k, v in self.out_links.items()},
+            "mtimes": self.mtimes,
+        }
+        atomic_write_bytes(self.cache_path, marshal.dumps(data))
+        self._dirty = False
     
     def path(self, stem: str) -> Optional[Path]:
         return self.stem_map.get(stem, None)
@@ -162,8 +345,14 @@ class Backlinks:
     def __contains__(self, fstem: str) -> None:
         return fstem in self.backlinks
 
-    def __getitem__(self, fstem: str) -> List[str]:
-        return list(sorted(self.backlinks.get(fstem, {})))
+    def __getitem__(self, fstem: str) -> Tuple[str, ...]:
+        # Sorted once per stem; invalidated whenever the stem's backlinks
+        # change, so hot pages skip the re-sort on every request.
+        cached = self._sorted_cache.get(fstem)
+        if cached is None:
+            cached = tuple(sorted(self.backlinks.get(fstem, ())))
+            self._sorted_cache[fstem] = cached
+        return cached
 
 
 class Backend:
@@ -179,12 +368,57 @@ class Backend:
             self.cache_dir = self.root_path / ".cache"
             self.cache_dir.mkdir(exist_ok=True)
 
-        self.md_ctx = markdown.Markdown(
+        # markdown.Markdown.convert mutates internal state, so each Flask
+        # worker thread gets its own lazily-built instance.
+        self._md_local = threading.local()
+
+        # Expensive cache-miss renders run here so concurrent requests can
+        # convert in parallel (Pygments releases the GIL while lexing).
+        self._render_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        entries = walk_notes(self.notes_root)
+        logger.info("Building directory of %d files", len(entries))
+        self._backlinks = Backlinks(self.cache_dir, entries)
+        self._sorted_stems = sorted(self._backlinks.stem_map)
+
+        # Hot pages are served straight from memory; the mtime key makes
+        # stale entries unreachable after an edit.
+        self._cached_body = functools.lru_cache(maxsize=512)(self._render_body)
+
+    def _build_md(self) -> "markdown.Markdown":
+        # Imported here rather than at module scope so CLI commands that
+        # never render (rename, remove, classify) skip the Pygments import.
+        import xml.etree.ElementTree as etree
+
+        import markdown
+        from markdown.extensions import Extension
+        from markdown.inlinepatterns import InlineProcessor
+
+        backend = self
+
+        class WikiLinkProcessor(InlineProcessor):
+            """Renders `[[link]]` tokens during the markdown pass itself,
+            instead of re-scanning the converted HTML afterwards."""
+
+            def handleMatch(self, m, data):
+                fname = m.group(1)
+                el = etree.Element("a", href=fname)
+                el.text = backend.title(fname)
+                return el, m.start(0), m.end(0)
+
+        class WikiLinkExtension(Extension):
+            def extendMarkdown(self, md):
+                md.inlinePatterns.register(
+                    WikiLinkProcessor(WIKILINK_RE.pattern, md),
+                    "wikilink", 75)
+
+        return markdown.Markdown(
             extensions=[
                 "tables",
                 "fenced_code",
                 "codehilite",
                 "mdx_math",
+                WikiLinkExtension(),
             ],
             extension_configs={
                 "mdx_math": {
@@ -195,9 +429,12 @@ class Backend:
             tab_length=2,
         )
 
-        self.fpaths = list(self.notes_root.glob("**/*.md"))
-        logger.info("Building directory of %d files", len(self.fpaths))
-        self._backlinks = Backlinks(self.cache_dir, self.fpaths)
+    @property
+    def md_ctx(self) -> "markdown.Markdown":
+        ctx = getattr(self._md_local, "md_ctx", None)
+        if ctx is None:
+            ctx = self._md_local.md_ctx = self._build_md()
+        return ctx
 
     @staticmethod
     def notes_root() -> Path:
@@ -209,21 +446,21 @@ class Backend:
             raise ValueError(f"Invalid NOTES_ROOT: {notes_root}")
         return notes_root
 
+    @property
+    def fpaths(self) -> List[Path]:
+        return self._backlinks.fpaths
+
     def rename(self, old_stem: str, new_stem: str) -> None:
         self._backlinks.rename(old_stem, new_stem)
+        self._sorted_stems = sorted(self._backlinks.stem_map)
+        # Renames rewrite other notes' links without bumping this cache's
+        # mtime keys, so drop all memoized bodies.
+        self._cached_body.cache_clear()
 
     def remove(self, stem: str) -> None:
         self._backlinks.remove(stem)
-
-    def render_link(self, href: str, value: str) -> str:
-        return f"<a href={href}>{value}</a>"
-
-    def update_links(self, match: re.Match) -> str:
-        fname = match.group(1)
-        return self.render_link(fname, self.title(fname))
-
-    def default_title(self, fname: str) -> str:
-        return fname.replace("-", " ").replace("_", "_").capitalize()
+        self._sorted_stems = sorted(self._backlinks.stem_map)
+        self._cached_body.cache_clear()
 
     def cached_file(self, fname: str) -> Path:
         return self.cache_dir / f"{fname}.html"
@@ -234,8 +471,25 @@ class Backend:
 
     def autocomplete(self, prefix: str, max_tags: int = 10) -> List[str]:
         prefix = prefix.lower().replace(" ", "-")
-        tags = [k for k in self._backlinks.titles.keys() if prefix in k]
-        return [k for k in sorted(tags)[:max_tags]]
+
+        # Stems are kept sorted, so the prefix matches form a contiguous
+        # range found by bisection rather than a full scan.
+        tags = []
+        start = bisect.bisect_left(self._sorted_stems, prefix)
+        for k in self._sorted_stems[start:start + max_tags]:
+            if not k.startswith(prefix):
+                break
+            tags.append(k)
+
+        # Fill the remaining slots with substring matches, stopping as soon
+        # as enough are found instead of collecting and sorting them all.
+        if len(tags) < max_tags:
+            for k in self._sorted_stems:
+                if prefix in k and not k.startswith(prefix):
+                    tags.append(k)
+                    if len(tags) >= max_tags:
+                        break
+        return tags
 
     def backlinks(self, fstem: str) -> List[str]:
         return [
@@ -249,31 +503,39 @@ class Backend:
         return self._backlinks.path(fname)
 
     def title(self, fname: str) -> str:
-        if fname in self._backlinks.titles:
-            return self._backlinks.titles[fname]
-        return self.default_title(fname)
+        title = self._backlinks.get_title(fname)
+        if title:
+            return title
+        return default_title(fname)
 
     def body(self, fname: str) -> str:
+        mtime_ns = os.stat(self.path(fname)).st_mtime_ns
+        if self.ignore_cached:
+            return self._render_body(fname, mtime_ns)
+        return self._cached_body(fname, mtime_ns)
+
+    def _render_body(self, fname: str, mtime_ns: int) -> str:
         fpath = self.path(fname)
-        last_mod_time = fpath.stat().st_mtime
 
         def get_markdown(fpath: Path) -> str:
+            ctx = self.md_ctx
+            ctx.reset()
             with open(fpath, "r") as f:
-                markdown = self.md_ctx.convert("".join(f.readlines()[1:]))
-            markdown = re.sub(r"\[\[(.+?)\]\]", self.update_links, markdown)
-            return markdown
+                f.readline()  # Skip the title line.
+                body_text = f.read()
+            # Wikilinks are handled inline by WikiLinkExtension, so the
+            # converted HTML needs no second pass.
+            return ctx.convert(body_text)
 
         if self.ignore_cached:
-            markdown = get_markdown(fpath)
-        else:
-            cached_file = self.cached_file(fname)
-            if cached_file.exists() and cached_file.stat().st_mtime > last_mod_time:
-                with open(cached_file, "r") as f:
-                    return f.read()
-            markdown = get_markdown(fpath)
-            with open(cached_file, "w") as f:
-                f.write(markdown)
-
+            return self._render_pool.submit(get_markdown, fpath).result()
+
+        cached_file = self.cached_file(fname)
+        if cached_file.exists() and cached_file.stat().st_mtime_ns > mtime_ns:
+            with open(cached_file, "r") as f:
+                return f.read()
+        markdown = self._render_pool.submit(get_markdown, fpath).result()
+        atomic_write_bytes(cached_file, markdown.encode("utf-8"))
         return markdown
 
     def __contains__(self, fstem: str) -> None:
@@ -362,7 +624,7 @@ if __name__ == "__main__":
             print("-" * len("Categories:"))
 
         print_categories()
-        for fpath in sorted(backend.fpaths):
+        for fpath in backend.fpaths:
             if fpath.parent != notes_root:
                 continue
             if fpath.stem.lower() == "readme":